@@ -1,67 +1,214 @@
 # Helper functions for formatting wiki text into HTML
+import re
+from dataclasses import dataclass, field
 from html import escape
-from typing import Dict, List
+from typing import Dict, List, Set
+
+try:
+    import ahocorasick
+except ImportError:  # optional, speeds up keyword linking
+    ahocorasick = None
 
 from .parser import parse_header, KeywordTarget
-from .config import Config
 
 
 def _is_word_char(ch: str) -> bool:
     return ch.isalnum() or ch == "_"
 
 
-def _apply_links_to_line(line: str, keywords: List[str], case_sensitive: bool) -> str:
-    """Return HTML for a line with keyword links applied."""
-    lower_line = line.lower()
-    occupied = [False] * len(line)
-    ranges: List[tuple[int, int, str]] = []
+def build_automaton(keywords: List[str], case_sensitive: bool):
+    """Return an Aho-Corasick automaton for ``keywords`` or ``None``.
+
+    ``None`` is returned when ``pyahocorasick`` is not installed or there are
+    no keywords, in which case callers fall back to :func:`build_pattern`.
+    """
+    if ahocorasick is None or not keywords:
+        return None
+    automaton = ahocorasick.Automaton()
     for kw in keywords:
-        search_kw = kw if case_sensitive else kw.lower()
-        start = 0
-        while True:
-            idx = line.find(kw, start) if case_sensitive else lower_line.find(search_kw, start)
-            if idx == -1:
-                break
-            end = idx + len(kw)
-            before_valid = idx == 0 or not _is_word_char(line[idx - 1])
-            after_valid = end == len(line) or not _is_word_char(line[end])
-            if before_valid and after_valid and not any(occupied[idx:end]):
-                ranges.append((idx, end, kw))
-                for i in range(idx, end):
-                    occupied[i] = True
-            start = end
-    ranges.sort()
-    html_parts = []
+        key = kw if case_sensitive else kw.lower()
+        if key not in automaton:
+            automaton.add_word(key, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def build_pattern(keywords: List[str], case_sensitive: bool) -> re.Pattern | None:
+    """Return one regex matching any of ``keywords`` as a whole word.
+
+    Alternatives are ordered longest first so the longest keyword wins at
+    each position. Case-insensitive patterns are built from lowercased
+    keywords and must be matched against lowercased text, which is faster
+    than ``re.IGNORECASE``. ``None`` is returned when there are no keywords.
+    """
+    if not keywords:
+        return None
+    if not case_sensitive:
+        keywords = list(dict.fromkeys(kw.lower() for kw in keywords))
+    ordered = sorted(keywords, key=len, reverse=True)
+    alternation = "|".join(re.escape(kw) for kw in ordered)
+    return re.compile(r"(?<!\w)(?:" + alternation + r")(?!\w)")
+
+
+def build_originals(keywords: List[str]) -> Dict[str, str]:
+    """Map lowercased keywords to their first spelling in ``keywords``."""
+    originals: Dict[str, str] = {}
+    for kw in keywords:
+        originals.setdefault(kw.lower(), kw)
+    return originals
+
+
+@dataclass
+class KeywordMatcher:
+    """Prebuilt keyword matching state shared by all formatted files.
+
+    Exactly one of ``automaton`` and ``pattern`` is set unless there are no
+    keywords at all.
+    """
+
+    case_sensitive: bool
+    automaton: object | None = None
+    pattern: re.Pattern | None = None
+    originals: Dict[str, str] | None = None
+    firsts: Set[str] = field(default_factory=set)
+
+
+def build_matcher(keyword_map: Dict[str, KeywordTarget], case_sensitive: bool) -> KeywordMatcher:
+    """Compile the keywords of ``keyword_map`` for :func:`format_content`."""
+    keywords = sorted(keyword_map, key=len, reverse=True)
+    matcher = KeywordMatcher(case_sensitive)
+    # first characters of all keywords, to skip lines that cannot link
+    matcher.firsts = {kw[0] if case_sensitive else kw[0].lower() for kw in keywords}
+    matcher.automaton = build_automaton(keywords, case_sensitive)
+    if matcher.automaton is None:
+        matcher.pattern = build_pattern(keywords, case_sensitive)
+        if not case_sensitive:
+            matcher.originals = build_originals(keywords)
+    return matcher
+
+
+def _match_pattern(haystack: str, pattern: re.Pattern, originals: Dict[str, str] | None) -> List[tuple[int, int, str]]:
+    """Return link ranges found by ``pattern`` in ``haystack``.
+
+    ``haystack`` is the line itself for case-sensitive patterns and the
+    lowercased line otherwise. ``originals`` is the :func:`build_originals`
+    table for case-insensitive patterns and ``None`` otherwise.
+    """
+    if originals is None:
+        return [(m.start(), m.end(), m.group()) for m in pattern.finditer(haystack)]
+    return [(m.start(), m.end(), originals[m.group()]) for m in pattern.finditer(haystack)]
+
+
+def _match_automaton(line: str, haystack: str, automaton) -> List[tuple[int, int, str]]:
+    """Return sorted link ranges using a single pass of ``automaton``.
+
+    ``haystack`` is ``line`` lowercased for case-insensitive automatons.
+    Overlapping matches are resolved like :func:`build_pattern`: the
+    leftmost match wins and the longest keyword wins at a given position.
+    """
+    candidates: List[tuple[int, int, str]] = []
+    for end_idx, kw in automaton.iter(haystack):
+        end = end_idx + 1
+        start = end - len(kw)
+        candidates.append((start, end, kw))
+    candidates.sort(key=lambda r: (r[0], r[0] - r[1]))
+    ranges: List[tuple[int, int, str]] = []
+    last_end = 0
+    for start, end, kw in candidates:
+        if start < last_end:
+            continue
+        before_valid = start == 0 or not _is_word_char(line[start - 1])
+        after_valid = end == len(line) or not _is_word_char(line[end])
+        if before_valid and after_valid:
+            ranges.append((start, end, kw))
+            last_end = end
+    return ranges
+
+
+def _apply_links_to_line(parts: List[str], line: str, ranges: List[tuple[int, int, str]]) -> None:
+    """Append HTML tokens for a line with keyword links applied to ``parts``."""
     last = 0
     for start, end, kw in ranges:
-        html_parts.append(escape(line[last:start]))
-        html_parts.append(f'<a href="{escape(kw)}">{escape(line[start:end])}</a>')
+        parts.extend((
+            escape(line[last:start]),
+            '<a href="',
+            escape(kw),
+            '">',
+            escape(line[start:end]),
+            "</a>",
+        ))
         last = end
-    html_parts.append(escape(line[last:]))
-    return "".join(html_parts)
+    parts.append(escape(line[last:]))
 
 
 HEADER_SIZES = {1: 24, 2: 18, 3: 16, 4: 14}
 
+# Closing part of the header <span> tag for each header level
+_HEADER_STYLES = {
+    level: f'" style="font-size:{size}px; font-weight:bold">' for level, size in HEADER_SIZES.items()
+}
+_DEFAULT_HEADER_STYLE = '" style="font-size:12px; font-weight:bold">'
+
+_PRE_OPEN = '<pre style="white-space: pre-wrap; font-family: monospace; font-size:12px">'
+_PRE_CLOSE = "</pre>"
+
+_INLINE_CODE_RE = re.compile(r"`[^`]*`")
+
+
+def _link_text(parts: List[str], text: str, matcher: KeywordMatcher) -> None:
+    """Append ``text`` to ``parts`` with keyword links applied."""
+    haystack = text if matcher.case_sensitive else text.lower()
+    if matcher.firsts.isdisjoint(haystack):
+        parts.append(escape(text))
+    elif matcher.automaton is not None:
+        _apply_links_to_line(parts, text, _match_automaton(text, haystack, matcher.automaton))
+    else:
+        # firsts is only non-empty when there are keywords, and then a
+        # matcher without an automaton has a pattern
+        assert matcher.pattern is not None
+        _apply_links_to_line(parts, text, _match_pattern(haystack, matcher.pattern, matcher.originals))
+
+
+def format_content(content: str, matcher: KeywordMatcher) -> str:
+    """Convert raw wiki text to HTML with links, wrapping and header styles.
 
-def format_content(content: str, keyword_map: Dict[str, KeywordTarget], config: Config) -> str:
-    """Convert raw wiki text to HTML with links, wrapping and header styles."""
-    keywords = sorted(keyword_map.keys(), key=len, reverse=True)
-    lines_html: List[str] = []
+    ``matcher`` is built once per keyword map with :func:`build_matcher`.
+    Text inside fenced code blocks and inline code spans is not linked.
+    """
+    parts: List[str] = [_PRE_OPEN]
+    append = parts.append
+    header_style = _HEADER_STYLES.get
+    in_fence = False
     for lineno, line in enumerate(content.splitlines(), 1):
         stripped = line.lstrip()
-        if stripped.startswith("#"):
+        if stripped[:1] == "#":
             level = len(stripped) - len(stripped.lstrip("#"))
             text, _ = parse_header(line)
-            size = HEADER_SIZES.get(level, 12)
-            anchor = f"ln{lineno}"
-            line_html = (
-                f'<span id="{anchor}" style="font-size:{size}px; font-weight:bold">'
-                f"{escape(text)}</span>"
-            )
+            parts.extend((
+                '<span id="ln',
+                str(lineno),
+                header_style(level, _DEFAULT_HEADER_STYLE),
+                escape(text),
+                "</span>\n",
+            ))
+            continue
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            append(escape(line))
+        elif in_fence:
+            append(escape(line))
+        elif "`" not in line:
+            _link_text(parts, line, matcher)
         else:
-            line_html = _apply_links_to_line(line, keywords, config.case_sensitive)
-        lines_html.append(line_html)
-    body = "\n".join(lines_html)
-    wrapper = '<pre style="white-space: pre-wrap; font-family: monospace; font-size:12px">{}</pre>'.format(body)
-    return wrapper
+            last = 0
+            for m in _INLINE_CODE_RE.finditer(line):
+                _link_text(parts, line[last:m.start()], matcher)
+                parts.extend(("<code>", escape(m.group()), "</code>"))
+                last = m.end()
+            _link_text(parts, line[last:], matcher)
+        append("\n")
+    if len(parts) > 1:
+        # drop the newline after the last line so lines are only separated
+        parts[-1] = parts[-1][:-1]
+    append(_PRE_CLOSE)
+    return "".join(parts)
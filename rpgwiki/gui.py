@@ -1,15 +1,16 @@
 import os
 import sys
-from typing import Dict
+from collections import OrderedDict
+from typing import Dict, TYPE_CHECKING
 
-from PyQt5.QtCore import Qt, QEvent, QUrl
+from PyQt5.QtCore import Qt, QEvent, QModelIndex, QUrl
+from PyQt5.QtGui import QTextDocument
 
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
     QTextBrowser,
-    QTreeWidget,
-    QTreeWidgetItem,
+    QTreeView,
     QFileDialog,
     QMessageBox,
     QSplitter,
@@ -19,12 +20,23 @@ from PyQt5.QtWidgets import (
     QToolBar,
 )
 
-from .formatter import format_content
+from .formatter import KeywordMatcher, build_matcher, format_content
 
-from .parser import scan_folder, scan_headers, KeywordTarget, HeaderEntry
-from .search import SearchPage
+from .index import HeaderIndex
+from .parser import KeywordTarget, HeaderEntry
+from .scanner import ScanCache, ScanThread
+from .tree import FsModel
 from .config import Config, load_config, save_config
 
+if TYPE_CHECKING:  # pragma: no cover - used for type hints
+    from .search import SearchPage
+
+
+# Characters of markdown whose rendered documents are kept for quick
+# Back/Forward navigation; a rendered document takes about 20 bytes per
+# character, so this holds roughly 20 MB
+DOCUMENT_CACHE_CHARS = 1_000_000
+
 
 def _is_word_char(ch: str) -> bool:
     return ch.isalnum() or ch == "_"
@@ -38,7 +50,19 @@ class WikiApp(QMainWindow):
 
         self.config_data: Config = load_config()
         self.keyword_map: Dict[str, KeywordTarget] = {}
+        self._lower_keyword_map: Dict[str, KeywordTarget] = {}
         self.headers: list[HeaderEntry] = []
+        self.header_index = HeaderIndex(self.headers)
+        self._matcher = KeywordMatcher(self.config_data.case_sensitive)
+        # (path, mtime) -> rendered document and length of its markdown
+        self._doc_cache: OrderedDict[tuple[str, float], tuple[QTextDocument, int]] = OrderedDict()
+        self._doc_cache_chars = 0
+        # keeps the displayed document alive after it leaves the cache
+        self._document: QTextDocument | None = None
+        # loaded from disk by the first scan
+        self._scan_cache: ScanCache | None = None
+        self._scan_thread: ScanThread | None = None
+        self._rescan_pending = False
         self.search_page: SearchPage | None = None
 
         self.history_back: list[str] = []
@@ -86,9 +110,9 @@ class WikiApp(QMainWindow):
 
         file_menu.addSeparator()
 
-        rescan_action = QAction("Rescan", self)
-        rescan_action.triggered.connect(self.rescan)
-        file_menu.addAction(rescan_action)
+        self.rescan_action = QAction("Rescan", self)
+        self.rescan_action.triggered.connect(self.rescan)
+        file_menu.addAction(self.rescan_action)
 
         search_action = QAction("Search", self)
         search_action.triggered.connect(self.show_search)
@@ -112,15 +136,20 @@ class WikiApp(QMainWindow):
         toolbar.addAction(self.forward_action)
 
         splitter = QSplitter()
-        self.tree = QTreeWidget()
+        self.tree_model = FsModel(self)
+        self.tree = QTreeView()
         self.tree.setHeaderHidden(True)
-        self.tree.itemExpanded.connect(self._on_expand)
-        self.tree.itemClicked.connect(self._on_select)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setModel(self.tree_model)
+        self.tree.clicked.connect(self._on_select)
         splitter.addWidget(self.tree)
 
         self.content_stack = QStackedWidget()
         self.text = QTextBrowser()
         self.text.setOpenExternalLinks(False)
+        # links are resolved by _on_anchor_clicked; letting the browser
+        # follow them would overwrite the cached document on display
+        self.text.setOpenLinks(False)
         self.text.anchorClicked.connect(self._on_anchor_clicked)
         self.content_stack.addWidget(self.text)
         splitter.addWidget(self.content_stack)
@@ -135,6 +164,8 @@ class WikiApp(QMainWindow):
 
     def show_search(self) -> None:
         if not self.search_page:
+            from .search import SearchPage
+
             self.search_page = SearchPage(self)
             self.content_stack.addWidget(self.search_page)
         self.content_stack.setCurrentWidget(self.search_page)
@@ -145,57 +176,27 @@ class WikiApp(QMainWindow):
         self.forward_action.setEnabled(bool(self.history_forward))
 
     def _load_saved_folders(self) -> None:
-        if self.config_data.world_dir:
-            self._add_folder_to_tree(self.config_data.world_dir, "World")
-        if self.config_data.campaign_dir:
-            self._add_folder_to_tree(self.config_data.campaign_dir, "Campaign")
+        self._reload_tree()
         self.rescan()
 
-    def _add_folder_to_tree(self, folder: str, tag: str) -> None:
-        node = QTreeWidgetItem(self.tree, [f"{tag}: {folder}"])
-        node.setData(0, Qt.UserRole, (folder, "dir"))
-        self._populate_tree(node, folder)
-        node.setExpanded(True)
-
-    def _populate_tree(self, parent: QTreeWidgetItem, path: str) -> None:
+    def _reload_tree(self) -> None:
+        """Rebuild the tree from the configured folders with one repaint."""
+        self.tree.setUpdatesEnabled(False)
         try:
-            entries = sorted(os.listdir(path))
-        except OSError:
-            return
+            self.tree_model.clear()
+            if self.config_data.world_dir:
+                self._add_folder_to_tree(self.config_data.world_dir, "World")
+            if self.config_data.campaign_dir:
+                self._add_folder_to_tree(self.config_data.campaign_dir, "Campaign")
+        finally:
+            self.tree.setUpdatesEnabled(True)
 
-        dirs: list[tuple[str, str]] = []
-        files: list[tuple[str, str]] = []
-        for entry in entries:
-            full = os.path.join(path, entry)
-            if os.path.isdir(full):
-                if self._has_md_files(full):
-                    dirs.append((entry, full))
-            elif entry.lower().endswith(".md") and not entry.startswith("_"):
-                files.append((entry, full))
-
-        for entry, full in dirs:
-            child = QTreeWidgetItem(parent, [entry])
-            child.setData(0, Qt.UserRole, (full, "dir"))
-            child.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
-        for entry, full in files:
-            name = os.path.splitext(entry)[0]
-            child = QTreeWidgetItem(parent, [name])
-            child.setData(0, Qt.UserRole, (full, "file"))
-
-    def _has_md_files(self, path: str) -> bool:
-        for root, _, files in os.walk(path):
-            for f in files:
-                if f.lower().endswith(".md") and not f.startswith("_"):
-                    return True
-        return False
-
-    def _on_expand(self, item: QTreeWidgetItem) -> None:
-        path, typ = item.data(0, Qt.UserRole)
-        if typ == "dir" and item.childCount() == 0:
-            self._populate_tree(item, path)
-
-    def _on_select(self, item: QTreeWidgetItem, column: int) -> None:
-        path, typ = item.data(0, Qt.UserRole)
+    def _add_folder_to_tree(self, folder: str, tag: str) -> None:
+        index = self.tree_model.add_folder(folder, f"{tag}: {folder}")
+        self.tree.expand(index)
+
+    def _on_select(self, index: QModelIndex) -> None:
+        path, typ = index.data(Qt.UserRole)
         if typ == "file":
             self.open_file(path)
 
@@ -203,10 +204,7 @@ class WikiApp(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select World Folder")
         if folder:
             self.config_data.world_dir = folder
-            self.tree.clear()
-            self._add_folder_to_tree(folder, "World")
-            if self.config_data.campaign_dir:
-                self._add_folder_to_tree(self.config_data.campaign_dir, "Campaign")
+            self._reload_tree()
             self.rescan()
             save_config(self.config_data)
 
@@ -214,23 +212,63 @@ class WikiApp(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Campaign Folder")
         if folder:
             self.config_data.campaign_dir = folder
-            self.tree.clear()
-            if self.config_data.world_dir:
-                self._add_folder_to_tree(self.config_data.world_dir, "World")
-            self._add_folder_to_tree(folder, "Campaign")
+            self._reload_tree()
             self.rescan()
             save_config(self.config_data)
 
     def rescan(self) -> None:
-        self.keyword_map.clear()
-        self.headers.clear()
-        if self.config_data.world_dir:
-            self.keyword_map.update(scan_folder(self.config_data.world_dir))
-            self.headers.extend(scan_headers(self.config_data.world_dir))
-        if self.config_data.campaign_dir:
-            camp_map = scan_folder(self.config_data.campaign_dir)
-            self.keyword_map.update(camp_map)
-            self.headers.extend(scan_headers(self.config_data.campaign_dir))
+        """Rescan the loaded folders in a background thread."""
+        if self._scan_thread is not None:
+            self._rescan_pending = True
+            return
+        folders = [
+            folder
+            for folder in (self.config_data.world_dir, self.config_data.campaign_dir)
+            if folder
+        ]
+        self._scan_thread = ScanThread(folders, self._scan_cache, self)
+        self._scan_thread.scanned.connect(self._on_scanned)
+        self._scan_thread.finished.connect(self._on_scan_finished)
+        self.rescan_action.setEnabled(False)
+        self._scan_thread.start()
+
+    def _on_scanned(self, result) -> None:
+        self.keyword_map, self.headers, self._scan_cache, self.header_index = result
+        self._lower_keyword_map = {}
+        for kw, target in self.keyword_map.items():
+            self._lower_keyword_map.setdefault(kw.lower(), target)
+        self._matcher = build_matcher(self.keyword_map, self.config_data.case_sensitive)
+        self._doc_cache.clear()
+        self._doc_cache_chars = 0
+        if self.current_file:
+            self._rerender(self.current_file)
+
+    def _rerender(self, path: str) -> None:
+        """Render the open file again with the current matcher, keeping its place."""
+        try:
+            doc = self._load_document(path)
+        except OSError:
+            return
+        scroll = self.text.verticalScrollBar()
+        pos = scroll.value()
+        self.text.setDocument(doc)
+        self._document = doc
+        scroll.setValue(pos)
+
+    def _on_scan_finished(self) -> None:
+        if self._scan_thread is not None:
+            self._scan_thread.deleteLater()
+            self._scan_thread = None
+        if self._rescan_pending:
+            self._rescan_pending = False
+            self.rescan()
+        else:
+            self.rescan_action.setEnabled(True)
+
+    def closeEvent(self, event) -> None:  # type: ignore[override]
+        if self._scan_thread is not None:
+            self._scan_thread.wait()
+        super().closeEvent(event)
 
     def open_file(self, path: str, add_history: bool = True) -> None:
         if add_history and self.current_file and path != self.current_file:
@@ -239,18 +277,36 @@ class WikiApp(QMainWindow):
         self.current_file = path
 
         try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
+            doc = self._load_document(path)
         except OSError as e:
             QMessageBox.critical(self, "Error", str(e))
             return
 
-        html = format_content(content, self.keyword_map, self.config_data)
-        self.text.setHtml(html)
+        self.text.setDocument(doc)
+        self._document = doc
         self.show_content()
-        self.text.document().clearUndoRedoStacks()
         self._update_nav_actions()
 
+    def _load_document(self, path: str) -> QTextDocument:
+        """Return the rendered document for ``path``, reusing cached ones."""
+        key = (path, os.path.getmtime(path))
+        cached = self._doc_cache.get(key)
+        if cached is not None:
+            self._doc_cache.move_to_end(key)
+            return cached[0]
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read()
+        doc = QTextDocument()
+        doc.setUndoRedoEnabled(False)
+        doc.setHtml(format_content(content, self._matcher))
+        self._doc_cache[key] = (doc, len(content))
+        self._doc_cache_chars += len(content)
+        # the newest document stays even if it alone is over the limit
+        while self._doc_cache_chars > DOCUMENT_CACHE_CHARS and len(self._doc_cache) > 1:
+            _, (_, size) = self._doc_cache.popitem(last=False)
+            self._doc_cache_chars -= size
+        return doc
+
     def go_back(self) -> None:
         if self.history_back:
             last = self.history_back.pop()
@@ -270,11 +326,7 @@ class WikiApp(QMainWindow):
         word = url.toString()
         target = self.keyword_map.get(word)
         if not target and not self.config_data.case_sensitive:
-            lower = word.lower()
-            for kw, tgt in self.keyword_map.items():
-                if kw.lower() == lower:
-                    target = tgt
-                    break
+            target = self._lower_keyword_map.get(word.lower())
         if target:
             self.open_file(target.file)
             anchor = f"ln{target.line}"
@@ -0,0 +1,127 @@
+"""Substring index over the scanned headers used by the search page."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .parser import HeaderEntry
+
+# Length of the substrings indexed for each header
+GRAM = 3
+# Appended to indexed texts so that every position starts a full trigram
+_PAD = '\0' * (GRAM - 1)
+# Candidate lists longer than this are not checked one by one; the joined
+# texts are searched instead
+SCAN_CANDIDATES = 512
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class HeaderIndex:
+    """Trigram index answering ``query in header.text`` without a full scan.
+
+    Every header containing the query also contains all of its trigrams,
+    so the shortest posting list of those trigrams holds every match; its
+    headers are then checked directly. When even that list is long the
+    query is common, and the casefolded texts joined into one string are
+    searched with ``str.find`` until enough matches are found. Texts are
+    padded so that every occurrence of a shorter query starts a trigram;
+    those are found by bisecting the sorted trigrams for the query as a
+    prefix. Trigrams are taken from the casefolded text: unlike ``lower()``
+    it maps each character on its own, so both case modes keep their matches.
+    """
+
+    def __init__(self, headers: List[HeaderEntry]) -> None:
+        self.headers = headers
+        # header texts kept in flat lists so that checking a candidate does
+        # not go through its HeaderEntry
+        self._texts = [entry.text for entry in headers]
+        self._texts_lower = [entry.text_lower for entry in headers]
+        folded = [text.casefold() for text in self._texts]
+        self._postings: Dict[str, List[int]] = {}
+        # lowercased text -> headers with that text, for exact matches
+        self._exact: Dict[str, List[HeaderEntry]] = {}
+        for idx, entry in enumerate(headers):
+            self._exact.setdefault(entry.text_lower, []).append(entry)
+            for gram in _grams(folded[idx] + _PAD):
+                self._postings.setdefault(gram, []).append(idx)
+        self._sorted_grams = sorted(self._postings)
+        # casefolded texts separated by NUL, and where each of them starts
+        self._joined = '\0'.join(folded)
+        self._starts: List[int] = []
+        pos = 0
+        for text in folded:
+            self._starts.append(pos)
+            pos += len(text) + 1
+        # casefolded query and candidates of the last posting list lookup; a
+        # query typed on from it only needs to check those candidates
+        self._last: Tuple[str, List[int]] = ('', [])
+
+    def _find(self, key: str) -> Iterator[int]:
+        """Yield indices of headers whose casefolded text contains ``key``."""
+        find = self._joined.find
+        starts = self._starts
+        pos = find(key)
+        while pos != -1:
+            idx = bisect_right(starts, pos) - 1
+            yield idx
+            if idx + 1 == len(starts):
+                return
+            pos = find(key, starts[idx + 1])
+
+    def _candidates(self, search: str) -> Iterable[int]:
+        """Return indices of headers that may contain ``search``, in order."""
+        key = search.casefold()
+        if not key:
+            return range(len(self.headers))
+        if len(key) < GRAM:
+            grams = self._sorted_grams
+            lo = bisect_left(grams, key)
+            hi = bisect_right(grams, key + '\U0010ffff' * (GRAM - len(key)), lo)
+            # merged lazily so that search() can stop early
+            merged = heapq.merge(*(self._postings[gram] for gram in grams[lo:hi]))
+            return (idx for idx, _ in itertools.groupby(merged))
+        candidates: List[int] | None = None
+        for gram in _grams(key):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        # a key of at least GRAM characters has at least one trigram
+        assert candidates is not None
+        last_key, last_candidates = self._last
+        if last_key and key.startswith(last_key) and len(last_candidates) < len(candidates):
+            candidates = last_candidates
+        if len(candidates) > SCAN_CANDIDATES and '\0' not in key:
+            return self._find(key)
+        self._last = (key, candidates)
+        return candidates
+
+    def search(
+        self, query: str, case_sensitive: bool, limit: int = 10
+    ) -> Tuple[List[HeaderEntry], List[HeaderEntry]]:
+        """Return headers equal to ``query`` and the first ``limit`` containing it."""
+        search = query if case_sensitive else query.lower()
+        full = [
+            entry
+            for entry in self._exact.get(search.lower(), ())
+            if not case_sensitive or entry.text == search
+        ]
+        # exact matches are already known, so stop once enough partials are found
+        partial: List[HeaderEntry] = []
+        if limit <= 0:
+            return full, partial
+        texts = self._texts if case_sensitive else self._texts_lower
+        for idx in self._candidates(search):
+            text = texts[idx]
+            if text != search and search in text:
+                partial.append(self.headers[idx])
+                if len(partial) == limit:
+                    break
+        return full, partial
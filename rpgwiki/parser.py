@@ -1,62 +1,110 @@
+import functools
+import itertools
 import os
 import re
-from dataclasses import dataclass
-from typing import Dict, Tuple, List
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterable, Iterator, Tuple, List
 
+# Threads reading files ahead of the parser, and how many files they may
+# read before the parser catches up
+READ_WORKERS = 4
+READ_AHEAD = 8
 
-@dataclass
+
+@dataclass(slots=True)
 class HeaderEntry:
     file: str
     line: int
     text: str
     preview: str
+    # lowercased text for case-insensitive searches
+    text_lower: str = field(init=False, repr=False, compare=False)
+    # file name shown with search results
+    basename: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.text_lower = self.text.lower()
+        self.basename = os.path.basename(self.file)
 
-@dataclass
+@dataclass(slots=True)
 class KeywordTarget:
     file: str
     line: int
     header: str
 
-# Regular expressions for parsing headers
-ASTERISK_RE = re.compile(r'\*([^*]+)\*')
-BANG_RE = re.compile(r'!([\w\s]+)')
+# path -> ((mtime_ns, size), keywords, headers) of the last scan
+ScanCache = Dict[str, Tuple[Tuple[int, int], Dict[str, KeywordTarget], List[HeaderEntry]]]
+
+
+@functools.cache
+def _patterns() -> Tuple[re.Pattern, re.Pattern, re.Pattern]:
+    """Return the asterisk, bang and plural header patterns.
 
-# '/s' plural suffix pattern
-PLURAL_RE = re.compile(r'(\b[^/]+)/s(\b)?', re.IGNORECASE)
+    They are compiled on first use so that importing the module stays cheap.
+    """
+    return (
+        re.compile(r'\*([^*]+)\*'),
+        re.compile(r'!([\w\s]+)'),
+        # '/s' plural suffix pattern
+        re.compile(r'(\b[^/]+)/s(\b)?', re.IGNORECASE),
+    )
 
 
-def parse_header(line: str) -> Tuple[str, List[str]]:
-    """Return visible header text and list of keywords."""
+@functools.lru_cache(maxsize=8192)
+def parse_header(line: str) -> Tuple[str, Tuple[str, ...]]:
+    """Return visible header text and keywords.
+
+    Results are cached as headers such as ``## Notes`` repeat across files.
+    """
+    asterisk_re, bang_re, plural_re = _patterns()
     keywords: List[str] = []
     text = line.strip().lstrip('#').strip()
     used_symbol = False
 
+    # Each pattern collects its keywords while it is substituted, so the
+    # header is scanned once per pattern, and only if it has the marker.
+    # The callbacks are only created for headers that need them.
+
     # bang keywords
-    for m in BANG_RE.finditer(text):
-        kw = m.group(1).strip()
-        if kw:
-            keywords.append(kw)
-            used_symbol = True
-    text = BANG_RE.sub('', text).strip()
+    if '!' in text:
+
+        def bang_repl(match: re.Match) -> str:
+            nonlocal used_symbol
+            kw = match.group(1).strip()
+            if kw:
+                keywords.append(kw)
+                used_symbol = True
+            return ''
+
+        text = bang_re.sub(bang_repl, text).strip()
 
     # asterisk keywords
-    for m in ASTERISK_RE.finditer(text):
-        kw = m.group(1).strip()
-        if kw:
-            keywords.append(kw)
-            used_symbol = True
-    text = ASTERISK_RE.sub(r'\1', text)
+    if '*' in text:
+
+        def asterisk_repl(match: re.Match) -> str:
+            nonlocal used_symbol
+            kw = match.group(1).strip()
+            if kw:
+                keywords.append(kw)
+                used_symbol = True
+            return match.group(1)
+
+        text = asterisk_re.sub(asterisk_repl, text)
 
     # plural keywords
-    def plural_repl(match: re.Match) -> str:
-        nonlocal used_symbol
-        base = match.group(1)
-        keywords.append(base)
-        keywords.append(base + 's')
-        used_symbol = True
-        return base
+    if '/' in text:
+
+        def plural_repl(match: re.Match) -> str:
+            nonlocal used_symbol
+            base = match.group(1)
+            keywords.append(base)
+            keywords.append(base + 's')
+            used_symbol = True
+            return base
 
-    text = PLURAL_RE.sub(plural_repl, text)
+        text = plural_re.sub(plural_repl, text)
 
     # synonym keywords with '/'
     if '/' in text:
@@ -76,64 +124,215 @@ def parse_header(line: str) -> Tuple[str, List[str]]:
         if used_symbol and text:
             keywords.append(text)
 
-    keywords = [kw for kw in keywords if kw]
-    return text.strip(), keywords
+    # drop empty and repeated keywords, keeping the first occurrence
+    return text.strip(), tuple(dict.fromkeys(kw for kw in keywords if kw))
 
 
-def scan_folder(folder: str) -> Dict[str, KeywordTarget]:
-    """Scan all md files in folder and return keyword map."""
-    keyword_map: Dict[str, KeywordTarget] = {}
-    for root, _, files in os.walk(folder):
-        for f in files:
-            if not f.lower().endswith('.md') or f.startswith('_'):
-                continue
-            path = os.path.join(root, f)
-            with open(path, 'r', encoding='utf-8', errors='ignore') as fp:
-                for lineno, line in enumerate(fp, 1):
-                    if line.lstrip().startswith('#'):
-                        text, kws = parse_header(line)
-                        for kw in kws:
-                            if kw not in keyword_map:
-                                keyword_map[kw] = KeywordTarget(path, lineno, text)
-                            # duplicates ignored; could log warning
-    return keyword_map
+def iter_md_files(folder: str) -> Iterator[os.DirEntry]:
+    """Yield directory entries of all wiki md files below folder.
 
+    Files are yielded in the same order ``os.walk`` would visit them.
+    """
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs: List[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+        elif entry.name.lower().endswith('.md') and not entry.name.startswith('_'):
+            yield entry
+    for path in subdirs:
+        yield from iter_md_files(path)
 
-def scan_headers(folder: str) -> List[HeaderEntry]:
-    """Return all headers within a folder."""
+
+def _iter_lines(fp: BinaryIO) -> Iterator[bytes]:
+    """Yield the raw lines of a binary file, split like text mode would."""
+    for chunk in fp:
+        # a chunk ends at b'\n' but may still hold lines ended by b'\r'
+        yield from chunk.splitlines()
+
+
+def _header_text(line: bytes) -> str | None:
+    """Return ``line`` decoded if it is a header line, else ``None``.
+
+    Lines without a '#' byte cannot be headers and are never decoded.
+    """
+    if b'#' not in line:
+        return None
+    text = line.decode('utf-8', 'ignore')
+    return text if text.lstrip().startswith('#') else None
+
+
+# Characters of following text needed to build a header preview
+PREVIEW_CHARS = 221
+
+
+def _preview(after: str) -> str:
+    """Return the preview of the text following a header."""
+    if len(after) <= 160:
+        return after
+    end = after.find('.', 160)
+    if end == -1 or end > 220:
+        preview = after[:220].rstrip()
+        if len(after) > 220:
+            preview += '...'
+        return preview
+    return after[: end + 1]
+
+
+def _scan_lines(
+    path: str, lines: Iterable[bytes]
+) -> Tuple[Dict[str, KeywordTarget], List[HeaderEntry]]:
+    """Return the keyword map and headers of the raw lines of ``path``.
+
+    Each header collects the words of the lines after it until it has
+    enough for its preview.
+    """
+    # all entries of the file share one path string
+    path = sys.intern(path)
+    keyword_map: Dict[str, KeywordTarget] = {}
     headers: List[HeaderEntry] = []
-    for root, _, files in os.walk(folder):
-        for f in files:
-            if not f.lower().endswith('.md') or f.startswith('_'):
+    # [header, preview words, joined length] of headers still collecting
+    pending: List[list] = []
+    for lineno, raw in enumerate(lines, 1):
+        if pending:
+            words = raw.decode('utf-8', 'ignore').split()
+            if words:
+                size = sum(map(len, words)) + len(words)
+                for item in pending:
+                    item[1].extend(words)
+                    item[2] += size
+                # older headers have seen more text, so they finish first
+                while pending and pending[0][2] > PREVIEW_CHARS:
+                    entry, entry_words, _ = pending.pop(0)
+                    entry.preview = _preview(' '.join(entry_words))
+
+        line = _header_text(raw)
+        if line is None:
+            continue
+        text, kws = parse_header(line)
+        for kw in kws:
+            if kw not in keyword_map:
+                keyword_map[kw] = KeywordTarget(path, lineno, text)
+            # duplicates ignored; could log warning
+        entry = HeaderEntry(file=path, line=lineno, text=text, preview='')
+        headers.append(entry)
+        pending.append([entry, [], -1])
+    for entry, entry_words, _ in pending:
+        entry.preview = _preview(' '.join(entry_words))
+    return keyword_map, headers
+
+
+def scan_file(path: str) -> Tuple[Dict[str, KeywordTarget], List[HeaderEntry]]:
+    """Return the keyword map and headers of a single md file."""
+    try:
+        with open(path, 'rb') as fp:
+            return _scan_lines(path, _iter_lines(fp))
+    except OSError:
+        return {}, []
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as fp:
+        return fp.read()
+
+
+def scan_files(
+    paths: List[str],
+) -> List[Tuple[Dict[str, KeywordTarget], List[HeaderEntry]]]:
+    """Return ``[scan_file(path) for path in paths]``.
+
+    A few threads read the next files while the current one is parsed,
+    so disk waits overlap parsing.
+    """
+    if len(paths) < 2:
+        return [scan_file(path) for path in paths]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    results: List[Tuple[Dict[str, KeywordTarget], List[HeaderEntry]]] = []
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as ex:
+        # only READ_AHEAD files are held in memory at a time
+        remaining = iter(paths)
+        ahead = deque(
+            (path, ex.submit(_read_file, path))
+            for path in itertools.islice(remaining, READ_AHEAD)
+        )
+        while ahead:
+            path, future = ahead.popleft()
+            nxt = next(remaining, None)
+            if nxt is not None:
+                ahead.append((nxt, ex.submit(_read_file, nxt)))
+            try:
+                data = future.result()
+            except OSError:
+                results.append(({}, []))
                 continue
-            path = os.path.join(root, f)
+            # bytes.splitlines() splits exactly like _iter_lines()
+            results.append(_scan_lines(path, data.splitlines()))
+    return results
+
+
+def scan_wiki(
+    folders: List[str], cache: ScanCache
+) -> Tuple[Dict[str, KeywordTarget], List[HeaderEntry], ScanCache]:
+    """Scan ``folders`` and return their keyword map, headers and a new cache.
+
+    Files whose stamp matches ``cache`` are not parsed again; the others are
+    parsed with :func:`scan_files`. Keywords of later folders override
+    earlier ones.
+    """
+    roots: List[List[Tuple[str, Tuple[int, int]]]] = []
+    for folder in folders:
+        files: List[Tuple[str, Tuple[int, int]]] = []
+        for entry in iter_md_files(folder):
             try:
-                with open(path, 'r', encoding='utf-8', errors='ignore') as fp:
-                    lines = fp.readlines()
+                st = entry.stat()
             except OSError:
                 continue
-            for lineno, line in enumerate(lines, 1):
-                if line.lstrip().startswith('#'):
-                    text, _ = parse_header(line)
-                    after = ' '.join(l.strip() for l in lines[lineno:])
-                    after = ' '.join(after.split())
-                    if len(after) <= 160:
-                        preview = after
-                    else:
-                        end = after.find('.', 160)
-                        if end == -1 or end > 220:
-                            end = 220
-                            preview = after[:end].rstrip()
-                            if len(after) > end:
-                                preview += '...'
-                        else:
-                            preview = after[: end + 1]
-                    headers.append(
-                        HeaderEntry(
-                            file=path,
-                            line=lineno,
-                            text=text,
-                            preview=preview,
-                        )
-                    )
-    return headers
+            files.append((sys.intern(entry.path), (st.st_mtime_ns, st.st_size)))
+        roots.append(files)
+
+    new_cache: ScanCache = {}
+    stale: Dict[str, Tuple[int, int]] = {}
+    for files in roots:
+        for path, stamp in files:
+            cached = cache.get(path)
+            if cached is not None and cached[0] == stamp:
+                new_cache[path] = cached
+            else:
+                stale[path] = stamp
+    if stale:
+        for path, (keywords, headers) in zip(stale, scan_files(list(stale))):
+            new_cache[path] = (stale[path], keywords, headers)
+
+    keyword_map: Dict[str, KeywordTarget] = {}
+    all_headers: List[HeaderEntry] = []
+    for files in roots:
+        folder_map: Dict[str, KeywordTarget] = {}
+        for path, _ in files:
+            _, keywords, headers = new_cache[path]
+            for kw, target in keywords.items():
+                folder_map.setdefault(kw, target)
+            all_headers.extend(headers)
+        keyword_map.update(folder_map)
+    return keyword_map, all_headers, new_cache
+
+
+
+def scan_folder(folder: str) -> Dict[str, KeywordTarget]:
+    """Scan all md files in folder and return keyword map."""
+    return scan_wiki([folder], {})[0]
+
+
+def scan_headers(folder: str) -> List[HeaderEntry]:
+    """Return all headers within a folder."""
+    return scan_wiki([folder], {})[1]
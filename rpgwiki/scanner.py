@@ -0,0 +1,87 @@
+"""Background scanning of the loaded wiki folders."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import List
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .index import HeaderIndex
+from .parser import HeaderEntry, KeywordTarget, ScanCache, scan_wiki
+
+CACHE_FILE = '.rpgwiki_cache.json'
+# bump whenever HeaderEntry, KeywordTarget or the cache layout change
+CACHE_VERSION = 5
+
+
+def load_scan_cache() -> ScanCache:
+    """Return the scan cache saved by :func:`save_scan_cache`, if usable."""
+    if os.path.exists(CACHE_FILE):
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return {}
+            cache: ScanCache = {}
+            for path, (stamp, keywords, headers) in data['files'].items():
+                path = sys.intern(path)
+                cache[path] = (
+                    (int(stamp[0]), int(stamp[1])),
+                    {
+                        kw: KeywordTarget(path, line, header)
+                        for kw, (line, header) in keywords.items()
+                    },
+                    [
+                        HeaderEntry(path, line, text, preview)
+                        for line, text, preview in headers
+                    ],
+                )
+            return cache
+        except Exception:
+            pass
+    return {}
+
+
+def save_scan_cache(cache: ScanCache) -> None:
+    # entries always belong to the file they are stored under, so their
+    # paths are not written again
+    files = {
+        path: [
+            list(stamp),
+            {kw: [target.line, target.header] for kw, target in keywords.items()},
+            [[entry.line, entry.text, entry.preview] for entry in headers],
+        ]
+        for path, (stamp, keywords, headers) in cache.items()
+    }
+    try:
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': files}, f)
+    except OSError:
+        pass
+
+
+class ScanThread(QThread):
+    """Run :func:`scan_wiki` without blocking the GUI.
+
+    ``scanned`` is emitted with the result of :func:`scan_wiki` and a
+    :class:`HeaderIndex` of its headers just before the thread finishes. A
+    ``cache`` of ``None`` loads the cache saved on disk by a previous run,
+    and changed caches are saved back.
+    """
+
+    scanned = pyqtSignal(object)
+
+    def __init__(self, folders: List[str], cache: ScanCache | None, parent=None) -> None:
+        super().__init__(parent)
+        self._folders = folders
+        self._cache = cache
+
+    def run(self) -> None:  # type: ignore[override]
+        cache = self._cache if self._cache is not None else load_scan_cache()
+        result = scan_wiki(self._folders, cache)
+        if result[2] != cache:
+            save_scan_cache(result[2])
+        self.scanned.emit((*result, HeaderIndex(result[1])))
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import List, TYPE_CHECKING
 
-from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtCore import Qt, QTimer, QUrl
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QTextBrowser
 
 from .parser import HeaderEntry
@@ -12,6 +12,20 @@ from .parser import HeaderEntry
 if TYPE_CHECKING:  # pragma: no cover - used for type hints
     from .gui import WikiApp
 
+# Milliseconds without typing before the results are updated
+SEARCH_DELAY = 80
+
+# HTML of one search result; the link target is the index into results
+_RESULT_TMPL = (
+    "<p>"
+    "<a href='{i}' style='text-decoration:none'>"
+    "<span style='font-size:18px; font-weight:bold'>{text}</span>"
+    "</a><br>"
+    "<span style='font-size:12px'>{preview}</span><br>"
+    "<span style='display:block; text-align:right; background-color:#eef; padding:1px 4px; border-radius:3px'>{filename}</span>"
+    "</p>"
+)
+
 
 class SearchPage(QWidget):
     """Widget used for searching headers within the loaded folders."""
@@ -20,7 +34,14 @@ class SearchPage(QWidget):
         super().__init__(parent)
         layout = QVBoxLayout(self)
 
+        # search as the user types, once they pause
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SEARCH_DELAY)
+        self._timer.timeout.connect(self.perform_search)
+
         self.edit = QLineEdit()
+        self.edit.textChanged.connect(self._timer.start)
         self.edit.returnPressed.connect(self.perform_search)
         layout.addWidget(self.edit)
 
@@ -39,35 +60,21 @@ class SearchPage(QWidget):
         self.edit.setFocus()
 
     def perform_search(self) -> None:
+        self._timer.stop()
         query = self.edit.text().strip()
         if not query:
+            self.browser.clear()
+            self.results = []
             return
         app: WikiApp = self.window()  # type: ignore[assignment]
-        case = app.config_data.case_sensitive
-        search = query if case else query.lower()
-        full: List[HeaderEntry] = []
-        partial: List[HeaderEntry] = []
-        for entry in app.headers:
-            text = entry.text if case else entry.text.lower()
-            if text == search:
-                full.append(entry)
-            elif search in text:
-                partial.append(entry)
-        partial = partial[:10]
+        full, partial = app.header_index.search(query, app.config_data.case_sensitive)
         self.results = full + partial
-        lines: List[str] = []
-        for idx, item in enumerate(self.results[:9], 1):
-            filename = item.file.split("/")[-1]
-            line = (
-                f"<p>"
-                f"<a href='{idx-1}' style='text-decoration:none'>"
-                f"<span style='font-size:18px; font-weight:bold'>{item.text}</span>"
-                f"</a><br>"
-                f"<span style='font-size:12px'>{item.preview}</span><br>"
-                f"<span style='display:block; text-align:right; background-color:#eef; padding:1px 4px; border-radius:3px'>{filename}</span>"
-                f"</p>"
+        lines = [
+            _RESULT_TMPL.format_map(
+                {"i": idx, "text": item.text, "preview": item.preview, "filename": item.basename}
             )
-            lines.append(line)
+            for idx, item in enumerate(self.results[:9])
+        ]
         self.browser.setHtml("\n".join(lines))
 
     def _activate(self, url: QUrl) -> None:
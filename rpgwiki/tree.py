@@ -0,0 +1,152 @@
+"""Lazy file tree model shown in the sidebar."""
+
+from __future__ import annotations
+
+import os
+from typing import List
+
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+
+
+class FsNode:
+    """A file or directory in the tree.
+
+    ``children`` stays ``None`` for directories until they are first
+    expanded.
+    """
+
+    __slots__ = ("name", "path", "is_dir", "parent", "row", "children")
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        is_dir: bool,
+        parent: FsNode | None = None,
+        row: int = 0,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.parent = parent
+        self.row = row
+        self.children: List[FsNode] | None = None
+
+
+class FsModel(QAbstractItemModel):
+    """Tree model listing markdown files of the loaded folders.
+
+    Directories are only read from disk when the view expands them.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._root = FsNode("", "", True)
+        self._root.children = []
+
+    def add_folder(self, folder: str, label: str) -> QModelIndex:
+        """Append a top level folder shown as ``label`` and return its index."""
+        children = self._root.children
+        # the root is never fetched lazily, its children are set in __init__
+        assert children is not None
+        row = len(children)
+        self.beginInsertRows(QModelIndex(), row, row)
+        children.append(FsNode(label, folder, True, self._root, row))
+        self.endInsertRows()
+        return self.index(row, 0)
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._root.children = []
+        self.endResetModel()
+
+    def _node(self, index: QModelIndex) -> FsNode:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:  # type: ignore[override]
+        children = self._node(parent).children
+        if column != 0 or not children or not 0 <= row < len(children):
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:  # type: ignore[override]
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # type: ignore[override]
+        children = self._node(parent).children
+        return len(children) if children else 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # type: ignore[override]
+        return 1
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid():
+            return None
+        node: FsNode = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name
+        if role == Qt.UserRole:
+            return (node.path, "dir" if node.is_dir else "file")
+        return None
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:  # type: ignore[override]
+        node = self._node(parent)
+        if not node.is_dir:
+            return False
+        if node.children is None:
+            return True
+        return bool(node.children)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:  # type: ignore[override]
+        node = self._node(parent)
+        return node.is_dir and node.children is None
+
+    def fetchMore(self, parent: QModelIndex) -> None:  # type: ignore[override]
+        node = self._node(parent)
+        if not node.is_dir or node.children is not None:
+            return
+        children = self._scan(node)
+        if not children:
+            # The view only re-checks hasChildren() on a data change, so
+            # tell it to drop the expand arrow of this empty directory.
+            node.children = []
+            self.dataChanged.emit(parent, parent)
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+
+    def _scan(self, node: FsNode) -> List[FsNode]:
+        """Return the child nodes of ``node``: directories first, then files."""
+        try:
+            with os.scandir(node.path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return []
+
+        dirs: List[os.DirEntry] = []
+        files: List[os.DirEntry] = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                # hidden folders such as .git or .obsidian hold no wiki pages
+                if not entry.name.startswith("."):
+                    dirs.append(entry)
+            elif entry.name.lower().endswith(".md") and not entry.name.startswith("_"):
+                files.append(entry)
+
+        children: List[FsNode] = []
+        for entry in dirs:
+            children.append(FsNode(entry.name, entry.path, True, node, len(children)))
+        for entry in files:
+            name = os.path.splitext(entry.name)[0]
+            children.append(FsNode(name, entry.path, False, node, len(children)))
+        return children